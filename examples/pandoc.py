@@ -29,7 +29,14 @@ class PandocHandler(frontmatter.YAMLHandler):
     END_DELIMITER = "..."
 
     def split(self, text):
-        "It's going to take a few passes to split here"
-        _, start, text = text.partition(self.START_DELIMITER)
-        fm, end, content = text.partition(self.END_DELIMITER)
-        return fm, content
+        "Find the start delimiter, then the end delimiter after it, and slice once"
+        start = text.find(self.START_DELIMITER)
+        if start < 0:
+            raise ValueError("No start delimiter found")
+
+        start += len(self.START_DELIMITER)
+        end = text.find(self.END_DELIMITER, start)
+        if end < 0:
+            raise ValueError("No end delimiter found")
+
+        return text[start:end], text[end + len(self.END_DELIMITER) :]
@@ -1,13 +1,5 @@
 import frontmatter
 
-POST_TEMPLATE = """\
-{content}
-
-{start_delimiter}
-{metadata}
-{end_delimiter}
-"""
-
 
 class ReverseYAMLHandler(frontmatter.YAMLHandler):
     """
@@ -60,17 +52,18 @@ class ReverseYAMLHandler(frontmatter.YAMLHandler):
         """
         Split text into frontmatter and content
         """
-        content, fm, _ = text.rsplit(self.FM_BOUNDARY, 2)
-        return fm, content
+        end = text.rfind(self.FM_BOUNDARY)
+        start = text.rfind(self.FM_BOUNDARY, 0, end) if end >= 0 else -1
+        if start < 0:
+            raise ValueError("Expected two front matter delimiters")
+
+        return text[start + len(self.FM_BOUNDARY) : end], text[:start]
 
     def format(self, post, **kwargs):
         start_delimiter = kwargs.pop("start_delimiter", self.START_DELIMITER)
         end_delimiter = kwargs.pop("end_delimiter", self.END_DELIMITER)
         metadata = self.export(post.metadata, **kwargs)
 
-        return POST_TEMPLATE.format(
-            content=post.content,
-            metadata=metadata,
-            start_delimiter=start_delimiter,
-            end_delimiter=end_delimiter,
+        return (
+            f"{post.content}\n\n{start_delimiter}\n{metadata}\n{end_delimiter}\n"
         ).strip()
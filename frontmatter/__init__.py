@@ -5,26 +5,83 @@ Python Frontmatter: Parse and manage posts with YAML frontmatter
 from __future__ import annotations
 
 import codecs
+import collections
+import contextlib
+import copy
+import datetime
+import functools
 import io
-from typing import TYPE_CHECKING, Iterable
+import mmap
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable, Iterator
 
 from .util import u
-from .default_handlers import YAMLHandler, JSONHandler, TOMLHandler
+from .default_handlers import YAMLHandler, JSONHandler, TOMLHandler, YAML, JSON, TOML
 
 
 if TYPE_CHECKING:
     from .default_handlers import BaseHandler
 
 
-__all__ = ["parse", "load", "loads", "dump", "dumps"]
+__all__ = [
+    "parse",
+    "load",
+    "loads",
+    "load_metadata",
+    "parse_many",
+    "dump",
+    "dumps",
+    "clear_cache",
+]
 
 
 # global handlers
-handlers = [
-    Handler()
-    for Handler in [YAMLHandler, JSONHandler, TOMLHandler]
-    if Handler is not None
-]
+handlers = [handler for handler in [YAML, JSON, TOML] if handler is not None]
+
+# used by dumps when a post has no handler of its own
+_DEFAULT_HANDLER = YAML
+
+# the default handlers' boundaries as one anchored alternation, in order, so
+# detect_format can find the matching default handler with a single match
+_DEFAULT_HANDLERS = list(handlers)
+_DEFAULT_HANDLER_TYPES: dict[type, BaseHandler] = {
+    type(handler): handler for handler in _DEFAULT_HANDLERS
+}
+_DETECT_RE = re.compile(
+    "|".join(
+        "({})".format(handler.FM_BOUNDARY.pattern)
+        for handler in _DEFAULT_HANDLERS
+        if handler.FM_BOUNDARY is not None
+    ),
+    re.MULTILINE,
+)
+
+
+def _detection(handler: BaseHandler) -> tuple[object, object]:
+    "What decides whether ``handler`` detects text: its boundary and detect method"
+    return handler.FM_BOUNDARY, getattr(handler.detect, "__func__", None)
+
+
+# how the default handlers detected text when _DETECT_RE was built
+_DEFAULT_DETECTION = [_detection(handler) for handler in _DEFAULT_HANDLERS]
+
+
+def _is_default(handlers: Iterable[BaseHandler]) -> bool:
+    """
+    True if ``handlers`` are the default handlers, still detecting text the
+    way _DETECT_RE does. A reassigned ``FM_BOUNDARY`` or an overridden
+    ``detect`` sends detection through the handlers themselves.
+    """
+    if handlers != _DEFAULT_HANDLERS:
+        return False
+
+    return all(
+        _detection(handler) == detection
+        for handler, detection in zip(handlers, _DEFAULT_DETECTION)
+    )
 
 
 def detect_format(text: str, handlers: Iterable[BaseHandler]) -> BaseHandler | None:
@@ -37,6 +94,12 @@ def detect_format(text: str, handlers: Iterable[BaseHandler]) -> BaseHandler | N
     ``handlers`` is a dictionary where keys are opening delimiters
     and values are handler instances.
     """
+    if _is_default(handlers):
+        match = _DETECT_RE.match(text)
+        if match is None or match.lastindex is None:
+            return None
+        return _DEFAULT_HANDLERS[match.lastindex - 1]
+
     for handler in handlers:
         if handler.detect(text):
             return handler
@@ -45,6 +108,78 @@ def detect_format(text: str, handlers: Iterable[BaseHandler]) -> BaseHandler | N
     return None
 
 
+# files larger than this are decoded straight from a memory map
+MMAP_THRESHOLD = 64 * 1024
+
+# load() keeps parsed files up to this many bytes in total, dropping the least
+# recently used first; 0 turns the cache off
+LOAD_CACHE_BYTES = 0
+
+# parsed files and their size, keyed by identity, change times, size and how
+# they were loaded, least recently used first
+_LOAD_CACHE: collections.OrderedDict[
+    Hashable, tuple[BaseHandler | None, dict[str, object], str, int]
+] = collections.OrderedDict()
+_load_cache_bytes = 0
+_LOAD_CACHE_LOCK = threading.Lock()
+
+# files changed more recently than this many nanoseconds ago aren't cached
+_LOAD_CACHE_MIN_AGE = 2 * 10**9
+
+# parse_many loads fewer files than this without starting worker processes
+PARALLEL_THRESHOLD = 4
+
+# load_metadata reads this much at a time, looking for the end of front matter
+_READ_SIZE = 8 * 1024
+
+
+@functools.lru_cache(maxsize=1024)
+def _load_cached(handler: BaseHandler, fm: str) -> object:
+    """
+    Parse front matter with a default handler, remembering results for repeated
+    blocks. Built-in handlers load the same way whatever the instance, so this is
+    only called with the default instance of each type.
+    """
+    return handler.load(fm)
+
+
+# immutable values that front matter loaders return, safe to share between copies
+_ATOMIC_TYPES = frozenset(
+    {str, int, float, bool, type(None), bytes, datetime.date, datetime.datetime}
+)
+
+
+def _copy_metadata(value: object, memo: dict[int, object]) -> object:
+    """
+    Deep copy parsed front matter. Plain dicts, lists and scalars, which is what
+    the default handlers produce, are copied directly because that's much
+    faster than ``copy.deepcopy``. Anything else goes through ``copy.deepcopy``.
+    Shared values, like YAML aliases, stay shared in the copy.
+    """
+    if type(value) in _ATOMIC_TYPES:
+        return value
+
+    key = id(value)
+    if key in memo:
+        return memo[key]
+
+    if type(value) is dict:
+        result: dict[object, object] = {}
+        memo[key] = result
+        for k, v in value.items():
+            result[k] = _copy_metadata(v, memo)
+        return result
+
+    if type(value) is list:
+        items: list[object] = []
+        memo[key] = items
+        for v in value:
+            items.append(_copy_metadata(v, memo))
+        return items
+
+    return copy.deepcopy(value, memo)
+
+
 def parse(
     text: str,
     encoding: str = "utf-8",
@@ -71,29 +206,60 @@ def parse(
 
     """
     # ensure unicode first
-    text = u(text, encoding).strip()
+    text = u(text, encoding).lstrip()
+    handler = handler or detect_format(text, handlers)
+    return _parse(text, handler, defaults)
 
-    # metadata starts with defaults
-    metadata = defaults.copy()
 
-    # this will only run if a handler hasn't been set higher up
-    handler = handler or detect_format(text, handlers)
+def _parse(
+    text: str, handler: BaseHandler | None, metadata: dict[str, object]
+) -> tuple[dict[str, object], str]:
+    """
+    Parse text that has already been decoded and had leading whitespace stripped.
+    Front matter is merged into ``metadata``, which should be a fresh dict of defaults.
+
+    Callers detect the handler first; with no handler, ``text`` has no front matter.
+    """
     if handler is None:
-        return metadata, text
+        return metadata, text.rstrip()
 
     # split on the delimiters
     try:
         fm, content = handler.split(text)
     except ValueError:
-        # if we can't split, bail
-        return metadata, text
+        # trailing whitespace can hide a closing delimiter on the last line
+        text = text.rstrip()
+        try:
+            fm, content = handler.split(text)
+        except ValueError:
+            # if we can't split, bail
+            return metadata, text
+
+    return _load_front_matter(fm, handler, metadata), content.strip()
+
+
+def _load_front_matter(
+    fm: str, handler: BaseHandler, metadata: dict[str, object]
+) -> dict[str, object]:
+    "Parse split front matter with ``handler`` and merge it into ``metadata``"
+    # blank front matter has nothing to merge, so skip the parser
+    if not fm.strip():
+        return metadata
 
     # parse, now that we have frontmatter
-    fm_data = handler.load(fm)
+    # identical blocks are common across a site, so the built-in handlers reuse
+    # earlier results and hand back a copy that callers are free to mutate;
+    # other handlers may keep state or return values that can't be copied
+    fm_data: object
+    if type(handler) in _DEFAULT_HANDLER_TYPES:
+        default = _DEFAULT_HANDLER_TYPES[type(handler)]
+        fm_data = _copy_metadata(_load_cached(default, fm), {})
+    else:
+        fm_data = handler.load(fm)
     if isinstance(fm_data, dict):
         metadata.update(fm_data)
 
-    return metadata, content.strip()
+    return metadata
 
 
 def check(fd: str | io.IOBase, encoding: str = "utf-8") -> bool:
@@ -113,8 +279,9 @@ def check(fd: str | io.IOBase, encoding: str = "utf-8") -> bool:
         text = fd.read()
 
     else:
-        with codecs.open(fd, "r", encoding) as f:
-            text = f.read()
+        with open(fd, "r", encoding=encoding, newline="\n") as f:
+            # the default handlers only need the first line
+            text = f.readline() if _is_default(handlers) else f.read()
 
     return checks(text, encoding)
 
@@ -133,10 +300,39 @@ def checks(text: str, encoding: str = "utf-8") -> bool:
         True
 
     """
+    if _is_default(handlers):
+        # the default handlers only need the first line
+        text = _first_line(text, encoding)
+
     text = u(text, encoding)
     return detect_format(text, handlers) != None
 
 
+def _first_line(text: str | bytes, encoding: str = "utf-8") -> str:
+    "Return the first line of ``text``, decoding no more than needed"
+    if isinstance(text, str):
+        end = text.find("\n")
+        return text if end < 0 else text[: end + 1]
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    chunks = []
+    start, size = 0, 256
+    while start < len(text):
+        # only the newest chunk can hold the first newline; double the step so a
+        # long first line takes few steps
+        chunk = decoder.decode(text[start : start + size], start + size >= len(text))
+        end = chunk.find("\n")
+        if end >= 0:
+            chunks.append(chunk[: end + 1])
+            break
+
+        chunks.append(chunk)
+        start += size
+        size *= 2
+
+    return "".join(chunks)
+
+
 def load(
     fd: str | io.IOBase,
     encoding: str = "utf-8",
@@ -153,16 +349,200 @@ def load(
         >>> with open('tests/yaml/hello-world.txt') as f:
         ...     post = frontmatter.load(f)
 
+    Set ``frontmatter.LOAD_CACHE_BYTES`` to let filenames reuse earlier parses
+    of files that haven't changed, up to that many bytes of files in total.
+    The cache is off by default.
     """
+    global _load_cache_bytes
+
     if hasattr(fd, "read"):
-        text = fd.read()
+        return loads(fd.read(), encoding, handler, **defaults)
+
+    st = os.stat(fd)
+    key: Hashable | None = None
+    if 0 < st.st_size <= LOAD_CACHE_BYTES:
+        # reuse the last parse of this file, as long as it hasn't changed since;
+        # the ctime moves on any write, even one that restores size and mtime
+        key = (
+            st.st_dev,
+            st.st_ino,
+            st.st_mtime_ns,
+            st.st_ctime_ns,
+            st.st_size,
+            encoding,
+            handler or tuple(handlers),
+        )
+        try:
+            with _LOAD_CACHE_LOCK:
+                cached = _LOAD_CACHE.get(key)
+                if cached is not None:
+                    _LOAD_CACHE.move_to_end(key)
+        except TypeError:
+            # unhashable handler
+            key = None
+        else:
+            if cached is not None:
+                handler, fm_data, content, _ = cached
+                post = Post(content, handler)
+                post.metadata = _copy_front_matter(fm_data, defaults)
+                return post
+
+    if st.st_size > MMAP_THRESHOLD:
+        text = _read_mapped(fd, encoding)
 
     else:
-        with codecs.open(fd, "r", encoding) as f:
-            text = f.read()
+        # one bulk decode is faster than decoding through a text wrapper
+        with open(fd, "rb") as f:
+            text = f.read().decode(encoding)
 
-    handler = handler or detect_format(text, handlers)
-    return loads(text, encoding, handler, **defaults)
+    if key is None:
+        return loads(text, encoding, handler, **defaults)
+
+    post = loads(text, encoding, handler)
+
+    # a file rewritten within one timestamp tick keeps its times, so only
+    # remember files that have been left alone for a while
+    changed = max(st.st_mtime_ns, st.st_ctime_ns)
+    if time.time_ns() - changed > _LOAD_CACHE_MIN_AGE:
+        # the post is the caller's to change, so keep a copy of its metadata
+        fm_data = _copy_front_matter(post.metadata, {})
+        with _LOAD_CACHE_LOCK:
+            if key not in _LOAD_CACHE:
+                _LOAD_CACHE[key] = (post.handler, fm_data, post.content, st.st_size)
+                _load_cache_bytes += st.st_size
+                while _load_cache_bytes > LOAD_CACHE_BYTES:
+                    _load_cache_bytes -= _LOAD_CACHE.popitem(last=False)[1][3]
+
+    defaults.update(post.metadata)
+    post.metadata = defaults
+    return post
+
+
+def _copy_front_matter(
+    fm_data: dict[str, object], metadata: dict[str, object]
+) -> dict[str, object]:
+    "Copy cached front matter into ``metadata``, so the cache and post never share"
+    memo: dict[int, object] = {}
+    for name, value in fm_data.items():
+        metadata[name] = _copy_metadata(value, memo)
+
+    return metadata
+
+
+def clear_cache() -> None:
+    """
+    Forget everything remembered from earlier calls.
+
+    With ``frontmatter.LOAD_CACHE_BYTES`` set, :py:func:`load <frontmatter.load>`
+    reuses the parse of a file until it's changed. Call this to free that
+    memory, or to reload files on filesystems with coarse timestamps.
+    """
+    global _load_cache_bytes
+
+    with _LOAD_CACHE_LOCK:
+        _LOAD_CACHE.clear()
+        _load_cache_bytes = 0
+    _load_cached.cache_clear()
+
+
+def load_metadata(
+    fd: str | io.IOBase,
+    encoding: str = "utf-8",
+    handler: BaseHandler | None = None,
+    **defaults: object,
+) -> dict[str, object]:
+    """
+    Load only the metadata from a file-like object or filename, and return it
+    as a dict. With the default handlers, reading stops once the front matter
+    ends, so this is much cheaper than :py:func:`load <frontmatter.load>` for
+    indexing long posts. Other handlers may look for front matter anywhere, so
+    they get the whole document.
+
+    .. doctest::
+
+        >>> frontmatter.load_metadata('tests/yaml/hello-world.txt')
+        {'title': 'Hello, world!', 'layout': 'post'}
+
+    """
+    if hasattr(fd, "read"):
+        return _read_metadata(fd.read, encoding, handler, defaults)
+
+    with open(fd, "rb") as f:
+        return _read_metadata(f.read, encoding, handler, defaults)
+
+
+def _splits_at_top(handler: BaseHandler | None) -> bool:
+    """
+    True if front matter for ``handler``, or for whichever default handler is
+    detected, has to start the document, so reading can stop once it ends.
+    Subclasses may split anywhere, like a handler for trailing front matter.
+    """
+    if handler is None:
+        return _is_default(handlers)
+
+    return type(handler) in _DEFAULT_HANDLER_TYPES
+
+
+def _read_metadata(
+    read: Callable[[int], str | bytes],
+    encoding: str,
+    handler: BaseHandler | None,
+    metadata: dict[str, object],
+) -> dict[str, object]:
+    "Read in chunks until the front matter can be split off, then parse it"
+    if not _splits_at_top(handler):
+        # front matter could be anywhere, so read and parse the whole document
+        chunk = read(-1)
+        text = chunk if isinstance(chunk, str) else chunk.decode(encoding)
+        text = u(text, encoding).lstrip()
+        handler = handler or detect_format(text, handlers)
+        return _parse(text, handler, metadata)[0]
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    text = ""
+    size = _READ_SIZE
+    while True:
+        # every miss re-splits the whole buffer, so double each read to keep
+        # the total work linear when the front matter is long or never closes
+        chunk = read(size)
+        size *= 2
+        final = not chunk
+        text += chunk if isinstance(chunk, str) else decoder.decode(chunk, final)
+
+        # only split complete lines, so a partial line can't pass for a delimiter
+        doc = u(text if final else text[: text.rfind("\n") + 1]).lstrip()
+        if not doc and not final:
+            continue
+
+        handler = handler or detect_format(doc, handlers)
+        if handler is None:
+            return metadata
+
+        try:
+            fm, _ = handler.split(doc)
+            break
+        except ValueError:
+            if not final:
+                continue
+
+        # same retry as _parse, for a closing delimiter on the last line
+        try:
+            fm, _ = handler.split(doc.rstrip())
+            break
+        except ValueError:
+            return metadata
+
+    return _load_front_matter(fm, handler, metadata)
+
+
+def _read_mapped(filename: str, encoding: str = "utf-8") -> str:
+    "Decode a file from a memory map, skipping the intermediate bytes copy"
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # the whole file is decoded front to back, so let the kernel read ahead
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return str(mm, encoding)
 
 
 def loads(
@@ -180,10 +560,77 @@ def loads(
         ...     post = frontmatter.loads(f.read())
 
     """
-    text = u(text, encoding)
+    text = u(text, encoding).lstrip()
     handler = handler or detect_format(text, handlers)
-    metadata, content = parse(text, encoding, handler, **defaults)
-    return Post(content, handler, **metadata)
+    metadata, content = _parse(text, handler, defaults)
+
+    # hand over the parsed dict as is, instead of unpacking it into keywords
+    post = Post(content, handler)
+    post.metadata = metadata
+    return post
+
+
+def _load_path(
+    path: str, encoding: str, handler: BaseHandler | None, defaults: dict[str, object]
+) -> Post:
+    "Load one file in a worker process"
+    return load(path, encoding, handler, **defaults)
+
+
+def parse_many(
+    paths: Iterable[str],
+    workers: int | None = None,
+    encoding: str = "utf-8",
+    handler: BaseHandler | None = None,
+    dedupe: bool = False,
+    **defaults: object,
+) -> Iterator[tuple[str, Post]]:
+    """
+    Load many files in parallel, yielding ``(path, post)`` pairs in the same order
+    as ``paths``. Files are spread across ``workers`` processes (one per CPU by default)
+    in batches, so each worker sets up its handlers once for many files.
+    With ``workers=1``, or fewer than ``PARALLEL_THRESHOLD`` files, they're loaded
+    in this process instead.
+
+    With ``dedupe=True``, posts with identical content share a single content
+    string, which saves memory when many files are copies of each other.
+    Each post still gets its own metadata. To find repeats, one copy of every
+    distinct content string is kept until the iteration finishes, even for
+    posts you've already discarded, so this costs memory when few files repeat.
+
+    .. doctest::
+
+        >>> paths = ['tests/yaml/hello-world.txt', 'tests/yaml/chinese.txt']
+        >>> for path, post in frontmatter.parse_many(paths, workers=2):
+        ...     print(path, post['title'])
+        tests/yaml/hello-world.txt Hello, world!
+        tests/yaml/chinese.txt Let's try unicode
+
+    """
+    paths = list(paths)
+    load_path = functools.partial(
+        _load_path, encoding=encoding, handler=handler, defaults=defaults
+    )
+
+    # the first post with each content, to share its string with repeats
+    seen: dict[str, str] = {}
+
+    with contextlib.ExitStack() as stack:
+        posts: Iterable[Post]
+        if workers == 1 or len(paths) < PARALLEL_THRESHOLD:
+            # starting worker processes costs more than loading a few files here
+            posts = map(load_path, paths)
+        else:
+            # importing this pulls in multiprocessing, so only do it when needed
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = stack.enter_context(ProcessPoolExecutor(workers))
+            posts = executor.map(load_path, paths, chunksize=32)
+
+        for path, post in zip(paths, posts):
+            if dedupe:
+                post.content = seen.setdefault(post.content, post.content)
+            yield path, post
 
 
 def dump(
@@ -230,12 +677,12 @@ def dump(
         Well, hello there, world.
 
     """
-    content = dumps(post, handler, **kwargs)
+    content = dumps(post, handler, **kwargs).encode(encoding)
     if hasattr(fd, "write"):
-        fd.write(content.encode(encoding))
+        fd.write(content)
 
     else:
-        with codecs.open(fd, "w", encoding) as f:
+        with open(fd, "wb") as f:
             f.write(content)
 
 
@@ -276,7 +723,8 @@ def dumps(post: Post, handler: BaseHandler | None = None, **kwargs: object) -> s
 
     """
     if handler is None:
-        handler = getattr(post, "handler", None) or YAMLHandler()
+        # posts may have had their handler deleted, so keep the fallback
+        handler = getattr(post, "handler", None) or _DEFAULT_HANDLER
 
     return handler.format(post, **kwargs)
 
@@ -289,12 +737,20 @@ class Post(object):
     will turn it back into text.
 
     For convenience, metadata values are available as proxied item lookups.
+
+    Posts only have ``content``, ``metadata`` and ``handler`` attributes, so
+    setting any other attribute raises ``AttributeError``. Keep extra values in
+    ``metadata``, or subclass ``Post`` to add attributes. Posts can still be
+    weakly referenced.
     """
 
+    __slots__ = ("content", "metadata", "handler", "__weakref__")
+
     def __init__(
         self, content: str, handler: BaseHandler | None = None, **metadata: object
     ) -> None:
-        self.content = str(content)
+        # content is almost always a str already, so skip the call
+        self.content = content if type(content) is str else str(content)
         self.metadata = metadata
         self.handler = handler
 
@@ -15,6 +15,12 @@ outlines the basic API and can be subclassed to deal with new formats.
 **Note**: The TOML handler is only available if the `toml <https://pypi.org/project/toml/>`_
 library is installed.
 
+**Note**: If PyYAML was built with `LibYAML <https://pyyaml.org/wiki/LibYAML>`_,
+the YAML handler parses and exports with the much faster ``CSafeLoader`` and
+``CSafeDumper``. Otherwise it falls back to PyYAML's pure-Python ``SafeLoader``
+and ``SafeDumper``, and issues an ``ImportWarning`` (hidden unless warnings are
+enabled, for example with ``python -W default``).
+
 Handlers
 --------
 
@@ -107,6 +113,16 @@ These three variations will produce the same export:
     >>> t1 == t2 == t3
     True
 
+Handlers don't keep any state between calls, so this module also provides
+shared instances, ``YAML``, ``JSON`` and ``TOML`` (``None`` without the
+``toml`` library). Reusing them saves creating a handler for every post:
+
+::
+
+    >>> from frontmatter.default_handlers import YAML
+    >>> frontmatter.dumps(post, handler=YAML) == t1
+    True
+
 All handlers use the interface defined on ``BaseHandler``. Each handler needs to know how to:
 
 - split metadata and content, based on a boundary pattern (``handler.split``)
@@ -120,12 +136,13 @@ from __future__ import annotations
 
 import json
 import re
+import warnings
 import yaml
 
 from types import ModuleType
 from typing import TYPE_CHECKING, Any, Type
 
-SafeDumper: Type[yaml.CDumper] | Type[yaml.SafeDumper]
+SafeDumper: Type[yaml.CSafeDumper] | Type[yaml.SafeDumper]
 SafeLoader: Type[yaml.CSafeLoader] | Type[yaml.SafeLoader]
 toml: ModuleType | None
 
@@ -136,6 +153,12 @@ except ImportError:
     from yaml import SafeDumper
     from yaml import SafeLoader
 
+    warnings.warn(
+        "PyYAML was built without LibYAML, so YAML front matter will be parsed "
+        "with the much slower pure-Python SafeLoader",
+        ImportWarning,
+    )
+
 try:
     import toml
 except ImportError:
@@ -148,12 +171,13 @@ if TYPE_CHECKING:
     from frontmatter import Post
 
 
-__all__ = ["BaseHandler", "YAMLHandler", "JSONHandler"]
+__all__ = ["BaseHandler", "YAMLHandler", "JSONHandler", "YAML", "JSON"]
 
 if toml:
-    __all__.append("TOMLHandler")
+    __all__ += ["TOMLHandler", "TOML"]
 
 
+# the layout BaseHandler.format builds, kept for handlers that format posts themselves
 DEFAULT_POST_TEMPLATE = """\
 {start_delimiter}
 {metadata}
@@ -163,6 +187,33 @@ DEFAULT_POST_TEMPLATE = """\
 """
 
 
+def _split_on_literal(
+    text: str, fm_boundary: re.Pattern[str], delimiter: str
+) -> tuple[str, str] | None:
+    """
+    Split ``text`` the way ``fm_boundary.split(text, 2)`` would, for boundaries
+    whose lines always start with ``delimiter``.
+
+    Returns None if the text doesn't open with a boundary line or the first
+    line starting with ``delimiter`` isn't one, so callers can fall back to
+    the regex.
+    """
+    start = fm_boundary.match(text)
+    if start is None:
+        return None
+
+    # a later boundary can only begin right after a newline
+    end = text.find("\n" + delimiter, start.end())
+    if end < 0:
+        return None
+
+    stop = fm_boundary.match(text, end + 1)
+    if stop is None:
+        return None
+
+    return text[start.end() : end + 1], text[stop.end() :]
+
+
 class BaseHandler:
     """
     BaseHandler lays out all the steps to detecting, splitting, parsing and
@@ -230,17 +281,27 @@ class BaseHandler:
         """
         Turn a post into a string, used in ``frontmatter.dumps``
         """
-        start_delimiter = kwargs.pop("start_delimiter", self.START_DELIMITER)
-        end_delimiter = kwargs.pop("end_delimiter", self.END_DELIMITER)
+        # most posts are dumped without options, so only look for them if given
+        if kwargs:
+            start_delimiter = kwargs.pop("start_delimiter", self.START_DELIMITER)
+            end_delimiter = kwargs.pop("end_delimiter", self.END_DELIMITER)
+        else:
+            start_delimiter = self.START_DELIMITER
+            end_delimiter = self.END_DELIMITER
 
         metadata = self.export(post.metadata, **kwargs)
 
-        return DEFAULT_POST_TEMPLATE.format(
-            metadata=metadata,
-            content=post.content,
-            start_delimiter=start_delimiter,
-            end_delimiter=end_delimiter,
-        ).strip()
+        # same layout as DEFAULT_POST_TEMPLATE, stripped at both ends; trim the
+        # pieces instead of the result, so the content isn't copied twice
+        head = f"{start_delimiter}\n{metadata}\n{end_delimiter}".lstrip()
+        content = post.content.rstrip()
+        if not head:
+            return content.lstrip()
+
+        if not content:
+            return head.rstrip()
+
+        return "".join((head, "\n\n", content))
 
 
 class YAMLHandler(BaseHandler):
@@ -252,16 +313,33 @@ class YAMLHandler(BaseHandler):
     FM_BOUNDARY = re.compile(r"^-{3,}\s*$", re.MULTILINE)
     START_DELIMITER = END_DELIMITER = "---"
 
+    def split(self, text: str) -> tuple[str, str]:
+        """
+        Split text into frontmatter and content.
+
+        Front matter always opens the document, so look for the closing ``---``
+        with a plain string search and only use the regex to confirm each
+        delimiter line. Anything unusual falls back to splitting with the regex.
+        """
+        if self.FM_BOUNDARY is YAMLHandler.FM_BOUNDARY:
+            parts = _split_on_literal(text, self.FM_BOUNDARY, "---")
+            if parts is not None:
+                return parts
+
+        return super().split(text)
+
     def load(self, fm: str, **kwargs: object) -> Any:
         """
-        Parse YAML front matter. This uses yaml.SafeLoader by default.
+        Parse YAML front matter. This uses yaml.SafeLoader by default,
+        or the faster yaml.CSafeLoader if LibYAML is available.
         """
         kwargs.setdefault("Loader", SafeLoader)
         return yaml.load(fm, **kwargs)  # type: ignore[arg-type]
 
     def export(self, metadata: dict[str, object], **kwargs: object) -> str:
         """
-        Export metadata as YAML. This uses yaml.SafeDumper by default.
+        Export metadata as YAML. This uses yaml.SafeDumper by default,
+        or the faster yaml.CSafeDumper if LibYAML is available.
         """
         kwargs.setdefault("Dumper", SafeDumper)
         kwargs.setdefault("default_flow_style", False)
@@ -283,6 +361,16 @@ class JSONHandler(BaseHandler):
     END_DELIMITER = ""
 
     def split(self, text: str) -> tuple[str, str]:
+        """
+        Split text into frontmatter and content, finding the closing brace line
+        with a plain string search when no bare ``{`` line could come first.
+        """
+        if self.FM_BOUNDARY is JSONHandler.FM_BOUNDARY:
+            parts = _split_on_literal(text, self.FM_BOUNDARY, "}")
+            if parts is not None and "\n{" not in parts[0]:
+                fm, content = parts
+                return "{" + fm + "}", content
+
         _, fm, content = self.FM_BOUNDARY.split(text, 2)
         return "{" + fm + "}", content
 
@@ -290,7 +378,18 @@ class JSONHandler(BaseHandler):
         return json.loads(fm, **kwargs)  # type: ignore[arg-type]
 
     def export(self, metadata: dict[str, object], **kwargs: object) -> str:
-        "Turn metadata into JSON"
+        """
+        Turn metadata into JSON, indented by four spaces by default.
+
+        Pass ``compact=True`` to put every key on a single line instead, which
+        lets ``json`` use its much faster C encoder for large metadata.
+        """
+        if kwargs.pop("compact", False):
+            kwargs.setdefault("separators", (",", ":"))
+            metadata_str = json.dumps(metadata, **kwargs)  # type: ignore[arg-type]
+            # keep the braces on lines of their own, so split() can find them
+            return u("{\n" + metadata_str[1:-1] + "\n}")
+
         kwargs.setdefault("indent", 4)
         metadata_str = json.dumps(metadata, **kwargs)  # type: ignore[arg-type]
         return u(metadata_str)
@@ -308,6 +407,18 @@ if toml:
         FM_BOUNDARY = re.compile(r"^\+{3,}\s*$", re.MULTILINE)
         START_DELIMITER = END_DELIMITER = "+++"
 
+        def split(self, text: str) -> tuple[str, str]:
+            """
+            Split text into frontmatter and content, finding the closing ``+++``
+            with a plain string search like ``YAMLHandler.split``.
+            """
+            if self.FM_BOUNDARY is TOMLHandler.FM_BOUNDARY:
+                parts = _split_on_literal(text, self.FM_BOUNDARY, "+++")
+                if parts is not None:
+                    return parts
+
+            return super().split(text)
+
         def load(self, fm: str, **kwargs: object) -> Any:
             assert toml is not None
             return toml.loads(fm, **kwargs)
@@ -320,3 +431,9 @@ if toml:
 
 else:
     TOMLHandler: Type[TOMLHandler] | None = None  #  type: ignore[no-redef]
+
+
+# shared instances, so callers don't need a new handler for every call
+YAML = YAMLHandler()
+JSON = JSONHandler()
+TOML = TOMLHandler() if TOMLHandler is not None else None
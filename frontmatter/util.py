@@ -14,5 +14,7 @@ def u(text: AnyStr, encoding: str = "utf-8") -> str:
         text_str = text
 
     # it's already unicode
-    text_str = text_str.replace("\r\n", "\n")
+    # checking for a carriage return is much faster than replace() finding none
+    if "\r" in text_str:
+        text_str = text_str.replace("\r\n", "\n")
     return text_str
@@ -27,7 +27,15 @@ setup(
     include_package_data=True,
     install_requires=["PyYAML"],
     extras_require={
-        "test": ["pytest", "toml", "pyaml", "mypy", "types-PyYAML", "types-toml"],
+        "test": [
+            "pytest",
+            "pytest-xdist",
+            "toml",
+            "pyaml",
+            "mypy",
+            "types-PyYAML",
+            "types-toml",
+        ],
         "docs": ["sphinx"],
     },
     tests_require=["python-frontmatter[test]"],
@@ -2,16 +2,17 @@
 import doctest
 import frontmatter
 
+# shared by every run below; doctest copies it, so examples can't leak names
+GLOBS = {"frontmatter": frontmatter}
+
 
 def test_readme():
-    doctest.testfile("../README.md", extraglobs={"frontmatter": frontmatter})
+    assert doctest.testfile("../README.md", extraglobs=GLOBS).failed == 0
 
 
 def test_api_docs():
-    doctest.testmod(frontmatter, extraglobs={"frontmatter": frontmatter})
+    assert doctest.testmod(frontmatter, extraglobs=GLOBS).failed == 0
 
 
 def test_handler_docs():
-    doctest.testmod(
-        frontmatter.default_handlers, extraglobs={"frontmatter": frontmatter}
-    )
+    assert doctest.testmod(frontmatter.default_handlers, extraglobs=GLOBS).failed == 0
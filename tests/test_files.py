@@ -5,9 +5,9 @@ Files should be in a subdirectory under `tests`, usually sorted by format (yaml,
 For a file called hello-world.markdown, there should be a corresponding file called hello-world.result.json
 matching the expected output.
 """
+import functools
 import os
 import json
-from itertools import chain
 from pathlib import Path
 
 import frontmatter
@@ -15,10 +15,18 @@ import pytest
 
 
 def files():
-    tests = Path(__file__).parent
-    md = tests.glob("**/*.md")
-    txt = tests.glob("**/*.txt")
-    return chain(md, txt)
+    "Markdown and text files anywhere under tests, in a stable order"
+    paths = []
+    for root, _, filenames in os.walk(Path(__file__).parent):
+        paths.extend(
+            Path(root, name) for name in filenames if name.endswith((".md", ".txt"))
+        )
+
+    return sorted(paths)
+
+
+# collect once, for every parametrized test below
+FILES = list(files())
 
 
 def get_result_filename(path):
@@ -26,21 +34,34 @@ def get_result_filename(path):
     return f"{root}.result.json"
 
 
-@pytest.mark.parametrize("filename", list(files()))
+@functools.lru_cache(maxsize=None)
+def load_result(filename):
+    "Parse the expected result for a file once, for every test that checks it"
+    result = Path(get_result_filename(filename))
+    if not result.exists():
+        pytest.fail(f"{result.name} does not exist")
+
+    return json.loads(result.read_text())
+
+
+@pytest.mark.parametrize("filename", FILES)
 def test_can_parse(filename):
     "Check we can load every file in our test directories without raising an error"
-    for filename in files():
-        post = frontmatter.load(filename)
-        assert isinstance(post, frontmatter.Post)
+    post = frontmatter.load(filename)
+    assert isinstance(post, frontmatter.Post)
 
 
-@pytest.mark.parametrize("filename", list(files()))
+@pytest.mark.parametrize("filename", FILES)
 def test_file(filename):
-    result = Path(get_result_filename(filename))
-    if not result.exists():
-        pytest.fail(f"{result.name} does not exist")
-
+    result = load_result(filename)
     post = frontmatter.load(filename)
-    result = json.loads(result.read_text())
 
     assert post.to_dict() == result
+
+
+@pytest.mark.parametrize("filename", FILES)
+def test_load_metadata(filename):
+    result = load_result(filename)
+    metadata = {key: value for key, value in result.items() if key != "content"}
+
+    assert frontmatter.load_metadata(filename) == metadata
@@ -2,18 +2,25 @@
 # -*- coding: utf-8 -*-
 
 
-import codecs
+import copy
 import doctest
 import glob
+import io
 import json
 import os
-import shutil
+import re
 import sys
 import tempfile
 import textwrap
 import unittest
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import yaml
 
 import frontmatter
+from frontmatter import default_handlers
 from frontmatter.default_handlers import YAMLHandler, JSONHandler, TOMLHandler
 
 try:
@@ -26,6 +33,20 @@ except ImportError:
     toml = None
 
 
+# fixture text, read once when the module is imported
+TEXTS = {}
+for path in [
+    "tests/yaml/hello-world.txt",
+    "tests/yaml/hello-markdown.md",
+    "tests/json/hello-json.md",
+    "tests/toml/hello-toml.md",
+    "tests/empty/no-frontmatter.txt",
+    "tests/yaml/unpretty.md",
+]:
+    with open(path, "rb") as f:
+        TEXTS[path] = f.read().decode("utf-8")
+
+
 class FrontmatterTest(unittest.TestCase):
     """
     Tests for parsing various kinds of content and metadata
@@ -33,27 +54,53 @@ class FrontmatterTest(unittest.TestCase):
 
     maxDiff = None
 
+    # posts shared by tests that only read them; copy before changing one
+    POST_FILES = [
+        "tests/yaml/hello-world.txt",
+        "tests/yaml/hello-markdown.md",
+        "tests/yaml/network-diagrams.md",
+        "tests/yaml/chinese.txt",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.posts = {path: frontmatter.load(path) for path in cls.POST_FILES}
+
+        # one scratch directory for the class; give each test its own filenames
+        tempdir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tempdir.cleanup)
+        cls.tempdir = tempdir.name
+
+    def copy_post(self, path):
+        "A post from the shared fixtures that's safe to change"
+        post = self.posts[path]
+        copied = frontmatter.Post(post.content, post.handler)
+        copied.metadata = copy.deepcopy(post.metadata)
+        return copied
+
     def test_with_markdown_content(self):
         "Parse frontmatter and only the frontmatter"
-        post = frontmatter.load("tests/yaml/hello-markdown.md")
+        post = self.posts["tests/yaml/hello-markdown.md"]
 
         metadata = {"author": "bob", "something": "else", "test": "tester"}
-        for k, v in metadata.items():
-            self.assertEqual(post[k], v)
+        self.assertEqual({k: post.metadata.get(k) for k in metadata}, metadata)
 
-    def test_unicode_post(self):
+    def test_unicode_load(self):
         "Ensure unicode is parsed correctly"
-        chinese = frontmatter.load("tests/yaml/chinese.txt", "utf-8")
-        output = frontmatter.dumps(chinese)
-        zh = "中文"
+        chinese = self.posts["tests/yaml/chinese.txt"]
 
         self.assertTrue(isinstance(chinese.content, str))
-
-        # check that we're dumping out unicode metadata, too
-        self.assertTrue(zh in output)
+        self.assertEqual(chinese["language"], "中文")
 
         # this shouldn't work as ascii, because it's Hanzi
-        self.assertRaises(UnicodeEncodeError, chinese.content.encode, "ascii")
+        with self.assertRaises(UnicodeEncodeError):
+            chinese.content.encode("ascii")
+
+    def test_unicode_dump(self):
+        "Ensure we're dumping out unicode metadata, too"
+        chinese = self.posts["tests/yaml/chinese.txt"]
+
+        self.assertIn("language: 中文", frontmatter.dumps(chinese))
 
     def test_check_no_frontmatter(self):
         "Checks if a file does not have a frontmatter"
@@ -67,15 +114,130 @@ class FrontmatterTest(unittest.TestCase):
 
         self.assertEqual(ret, True)
 
+    def test_checks_long_first_line(self):
+        "A long first line without a newline is read once, not rescanned"
+        self.assertFalse(frontmatter.checks(b"x" * 8000000))
+
+        text = "中文" * 100000
+        self.assertEqual(frontmatter._first_line(text.encode("utf-8")), text)
+        self.assertTrue(frontmatter.checks(("---\n" + text).encode("utf-8")))
+
     def test_no_frontmatter(self):
         "This is not a zen exercise."
         post = frontmatter.load("tests/empty/no-frontmatter.txt")
-        with codecs.open("tests/empty/no-frontmatter.txt", "r", "utf-8") as f:
-            content = f.read().strip()
+        content = TEXTS["tests/empty/no-frontmatter.txt"].strip()
 
         self.assertEqual(post.metadata, {})
         self.assertEqual(post.content, content)
 
+    def test_large_file(self):
+        "Large files are read through a memory map"
+        content = "Lots of content.\n" * (frontmatter.MMAP_THRESHOLD // 10)
+        filename = os.path.join(self.tempdir, "large.md")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write("---\ntitle: Large\n---\n\n" + content)
+
+        post = frontmatter.load(filename)
+
+        self.assertEqual(post["title"], "Large")
+        self.assertEqual(post.content, content.strip())
+
+    def test_load_cache(self):
+        "With the cache on, unchanged files are parsed once, changed files again"
+        filename = os.path.join(self.tempdir, "cached.md")
+        other = os.path.join(self.tempdir, "other.md")
+
+        def write(path, text):
+            # replace the file, like rsync or tar, keeping an old mtime
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.utime(path + ".tmp", (1000000000, 1000000000))
+            os.replace(path + ".tmp", path)
+
+        self.addCleanup(frontmatter.clear_cache)
+        write(filename, "---\ntitle: First\ntags: [a]\n---\n\nFirst post")
+
+        # off by default
+        frontmatter.load(filename)
+        self.assertEqual(len(frontmatter._LOAD_CACHE), 0)
+
+        # files changed very recently are never cached, so don't wait for that
+        with mock.patch.multiple(
+            frontmatter, LOAD_CACHE_BYTES=60, _LOAD_CACHE_MIN_AGE=-1
+        ):
+            post = frontmatter.load(filename, layout="post")
+            post["tags"].append("b")
+            self.assertEqual(len(frontmatter._LOAD_CACHE), 1)
+
+            post = frontmatter.load(filename)
+            self.assertEqual(post.metadata, {"title": "First", "tags": ["a"]})
+            self.assertEqual(post.content, "First post")
+
+            # a different size is picked up
+            write(filename, "---\ntitle: Second\ntags: [a]\n---\n\nSecond post")
+            self.assertEqual(frontmatter.load(filename)["title"], "Second")
+
+            # and so is a new file with the same size and mtime
+            write(filename, "---\ntitle: Third!\ntags: [a]\n---\n\nSecond post")
+            self.assertEqual(frontmatter.load(filename)["title"], "Third!")
+
+            # two files don't fit, so the least recently used one goes
+            frontmatter.clear_cache()
+            write(other, "---\ntitle: Other\ntags: [a]\n---\n\nSecond post")
+            frontmatter.load(filename)
+            frontmatter.load(other)
+            self.assertEqual(len(frontmatter._LOAD_CACHE), 1)
+            self.assertEqual(frontmatter.load(filename)["title"], "Third!")
+
+    def test_load_cache_threads(self):
+        "Threads can share the cache without losing track of its size"
+        paths = sorted(glob.glob("tests/yaml/*.txt") + glob.glob("tests/yaml/*.md"))
+        self.addCleanup(frontmatter.clear_cache)
+
+        with mock.patch.multiple(
+            frontmatter, LOAD_CACHE_BYTES=2000, _LOAD_CACHE_MIN_AGE=-1
+        ):
+            with ThreadPoolExecutor(8) as executor:
+                posts = list(executor.map(frontmatter.load, paths * 50))
+
+            sizes = [entry[3] for entry in frontmatter._LOAD_CACHE.values()]
+            self.assertEqual(frontmatter._load_cache_bytes, sum(sizes))
+            self.assertLessEqual(sum(sizes), 2000)
+
+        for path, post in zip(paths, posts):
+            self.assertEqual(post.metadata, frontmatter.load(path).metadata)
+
+    def test_load_metadata(self):
+        "Load only metadata, without reading the rest of the file"
+        metadata = frontmatter.load_metadata("tests/yaml/chinese.txt", extra="default")
+        post = frontmatter.load("tests/yaml/chinese.txt", extra="default")
+        self.assertEqual(metadata, post.metadata)
+
+        body = "Lots of content.\n" * 10000
+        f = io.BytesIO("---\ntitle: Large\n---\n\n{}".format(body).encode("utf-8"))
+
+        self.assertEqual(frontmatter.load_metadata(f), {"title": "Large"})
+        self.assertLess(f.tell(), len(body))
+
+    def test_load_metadata_trailing(self):
+        "Handlers that split anywhere get the whole document"
+
+        class TrailingYAMLHandler(YAMLHandler):
+            def split(self, text):
+                content, fm, _ = text.rsplit("---", 2)
+                return fm, content
+
+        # the early rules look like front matter to a split of the first chunk
+        body = "Rules\n---\nnot: metadata\n---\n" + "Lots of content.\n" * 10000
+        text = "{}\n---\ntitle: Trailing\n---\n".format(body)
+        handler = TrailingYAMLHandler()
+
+        metadata = frontmatter.load_metadata(
+            io.BytesIO(text.encode("utf-8")), handler=handler
+        )
+        self.assertEqual(metadata, {"title": "Trailing"})
+        self.assertEqual(metadata, frontmatter.loads(text, handler=handler).metadata)
+
     def test_empty_frontmatter(self):
         "Frontmatter, but no metadata"
         post = frontmatter.load("tests/empty/empty-frontmatter.txt")
@@ -84,6 +246,63 @@ class FrontmatterTest(unittest.TestCase):
         self.assertEqual(post.metadata, {})
         self.assertEqual(post.content, content)
 
+    def test_empty_frontmatter_skips_load(self):
+        "Blank frontmatter keeps defaults and never reaches the handler"
+
+        class StrictYAMLHandler(YAMLHandler):
+            def load(self, fm, **kwargs):
+                raise AssertionError("loaded blank frontmatter")
+
+        post = frontmatter.loads(
+            "---\n  \n---\nContent", handler=StrictYAMLHandler(), layout="post"
+        )
+        self.assertEqual(post.metadata, {"layout": "post"})
+        self.assertEqual(post.content, "Content")
+
+    def test_handler_errors_propagate(self):
+        "A TypeError from the handler is raised once, not retried"
+        calls = []
+
+        class BrokenYAMLHandler(YAMLHandler):
+            def load(self, fm, **kwargs):
+                calls.append(fm)
+                raise TypeError("broken")
+
+        with self.assertRaises(TypeError):
+            frontmatter.loads("---\ntitle: Broken\n---\n", handler=BrokenYAMLHandler())
+        self.assertEqual(len(calls), 1)
+
+    def test_custom_handler_load_not_cached(self):
+        "Custom handlers load every time, and their values aren't copied"
+
+        class Uncopyable:
+            def __deepcopy__(self, memo):
+                raise TypeError("can't copy")
+
+        class CountingYAMLHandler(YAMLHandler):
+            count = 0
+
+            def load(self, fm, **kwargs):
+                self.count += 1
+                return {"count": self.count, "value": value}
+
+        value = Uncopyable()
+        handler = CountingYAMLHandler()
+        text = "---\ntitle: Counted\n---\n"
+
+        self.assertEqual(frontmatter.loads(text, handler=handler)["count"], 1)
+        post = frontmatter.loads(text, handler=handler)
+        self.assertEqual(post["count"], 2)
+        self.assertIs(post["value"], value)
+
+    def test_reserved_metadata_keys(self):
+        "Metadata keys can share names with Post arguments, or not be strings"
+        post = frontmatter.loads("---\ncontent: a\nhandler: b\n1: c\n---\nBody")
+
+        self.assertEqual(post.metadata, {"content": "a", "handler": "b", 1: "c"})
+        self.assertEqual(post.content, "Body")
+        self.assertIsInstance(post.handler, YAMLHandler)
+
     def test_extra_space(self):
         "Extra space in frontmatter delimiter"
         post = frontmatter.load("tests/yaml/extra-space.txt")
@@ -91,68 +310,137 @@ class FrontmatterTest(unittest.TestCase):
 
         self.assertEqual(post.content, content)
         metadata = {"something": "else", "test": "tester"}
-        for k, v in metadata.items():
-            self.assertEqual(post[k], v)
+        self.assertEqual({k: post.metadata.get(k) for k in metadata}, metadata)
+
+    def test_repeated_frontmatter_is_independent(self):
+        "Posts parsed from identical frontmatter don't share metadata"
+        text = "---\ntags: [one, two]\n---\n\nSame frontmatter."
+        post = frontmatter.loads(text)
+        post["tags"].append("three")
+        post["title"] = "Changed"
+
+        repost = frontmatter.loads(text)
+        self.assertEqual(repost.metadata, {"tags": ["one", "two"]})
+
+    def test_yaml_aliases(self):
+        "YAML aliases still point to the same value"
+        text = "---\ntags: &tags [one, two]\ncategories: *tags\n---\n\nAliases."
+        for _ in range(2):
+            post = frontmatter.loads(text)
+            self.assertIs(post["tags"], post["categories"])
+
+    def test_parse_many(self):
+        "Load files in worker processes, or here for small batches"
+        paths = sorted(glob.glob("tests/yaml/*.txt") + glob.glob("tests/yaml/*.md"))
+        self.assertGreaterEqual(len(paths), frontmatter.PARALLEL_THRESHOLD)
+
+        for workers in [None, 1]:
+            with self.subTest(workers=workers):
+                results = list(frontmatter.parse_many(paths, workers, extra=True))
+                self.assertEqual([path for path, _ in results], paths)
+                for path, post in results:
+                    expected = frontmatter.load(path, extra=True)
+                    self.assertEqual(post.to_dict(), expected.to_dict())
+
+    def test_parse_many_dedupe(self):
+        "Identical files share content but not metadata"
+        paths = ["tests/yaml/hello-world.txt", "tests/yaml/hello-world.txt"]
+        (_, first), (_, second) = frontmatter.parse_many(paths, dedupe=True)
+
+        self.assertIs(first.content, second.content)
+        self.assertIsNot(first.metadata, second.metadata)
 
     def test_to_dict(self):
         "Dump a post as a dict, for serializing"
-        post = frontmatter.load("tests/yaml/network-diagrams.md")
+        post = self.posts["tests/yaml/network-diagrams.md"]
         post_dict = post.to_dict()
 
-        for k, v in post.metadata.items():
-            self.assertEqual(post_dict[k], v)
+        self.assertEqual({k: post_dict[k] for k in post.metadata}, post.metadata)
 
         self.assertEqual(post_dict["content"], post.content)
 
     def test_to_string(self):
         "Calling str(post) returns post.content"
-        post = frontmatter.load("tests/yaml/hello-world.txt")
+        post = self.posts["tests/yaml/hello-world.txt"]
 
         # test unicode and bytes
         text = "Well, hello there, world."
         self.assertEqual(str(post), text)
         self.assertEqual(bytes(post), text.encode("utf-8"))
 
+    def test_post_slots(self):
+        "Posts only store content, metadata and handler"
+        post = self.posts["tests/yaml/hello-world.txt"]
+
+        self.assertFalse(hasattr(post, "__dict__"))
+        with self.assertRaises(AttributeError):
+            post.title = "Hello, world!"
+
+        self.assertIs(weakref.ref(post)(), post)
+
+    @unittest.skipUnless(pyaml, "requires pyaml")
     def test_pretty_dumping(self):
         "Use pyaml to dump nicer"
-        if pyaml is not None:
-            with codecs.open("tests/yaml/unpretty.md", "r", "utf-8") as f:
-                data = f.read()
+        data = TEXTS["tests/yaml/unpretty.md"]
 
-            post = frontmatter.load("tests/yaml/unpretty.md")
-            yaml = pyaml.dump(post.metadata)
+        post = frontmatter.loads(data)
+        yaml = pyaml.dump(post.metadata)
 
-            # the unsafe dumper gives you nicer output, for times you want that
-            dump = frontmatter.dumps(post, Dumper=pyaml.PYAMLDumper)
+        # the unsafe dumper gives you nicer output, for times you want that
+        dump = frontmatter.dumps(post, Dumper=pyaml.PYAMLDumper)
 
-            self.assertTrue(yaml in dump)
-            self.assertEqual(dump, data)
+        self.assertTrue(yaml in dump)
+        self.assertEqual(dump, data)
 
     def test_with_crlf_string(self):
         markdown_bytes = b'---\r\ntitle: "my title"\r\ncontent_type: "post"\r\npublished: no\r\n---\r\n\r\nwrite your content in markdown here'
         loaded = frontmatter.loads(markdown_bytes, "utf-8")
         self.assertEqual(loaded["title"], "my title")
 
+    def test_dumping_after_changing_metadata(self):
+        "dumping again picks up any change to metadata"
+        post = self.copy_post("tests/yaml/network-diagrams.md")
+        frontmatter.dumps(post)
+
+        post.metadata["tags"].append("network")
+        self.assertIn("- network", frontmatter.dumps(post))
+
+        post["published"] = 1
+        self.assertIn("published: 1", frontmatter.dumps(post))
+
+        post["published"] = True
+        self.assertIn("published: true", frontmatter.dumps(post))
+
+    def test_dumping_recursive_metadata(self):
+        "metadata that contains itself dumps with YAML anchors"
+        post = frontmatter.loads("---\na: &x [1, *x]\n---\n\nLoops.")
+        self.assertIs(post["a"][1], post["a"])
+
+        repost = frontmatter.loads(frontmatter.dumps(post))
+        self.assertIs(repost["a"][1], repost["a"])
+
     def test_dumping_with_custom_delimiters(self):
         "dump with custom delimiters"
-        post = frontmatter.load("tests/yaml/hello-world.txt")
+        post = self.posts["tests/yaml/hello-world.txt"]
         dump = frontmatter.dumps(post, start_delimiter="+++", end_delimiter="+++")
 
         self.assertTrue("+++" in dump)
 
     def test_dump_to_file(self):
-        "dump post to filename"
-        post = frontmatter.load("tests/yaml/hello-world.txt")
+        "dump post to a file object or a filename"
+        post = self.posts["tests/yaml/hello-world.txt"]
 
-        tempdir = tempfile.mkdtemp()
-        filename = os.path.join(tempdir, "hello.md")
-        frontmatter.dump(post, filename)
+        expected = frontmatter.dumps(post).encode("utf-8")
 
-        with open(filename) as f:
-            self.assertEqual(f.read(), frontmatter.dumps(post))
+        buf = io.BytesIO()
+        frontmatter.dump(post, buf)
+        self.assertEqual(buf.getvalue(), expected)
 
-        # cleanup
-        shutil.rmtree(tempdir)
+        # and once by filename, which dump opens itself
+        filename = os.path.join(self.tempdir, "hello.md")
+        frontmatter.dump(post, filename)
+        with open(filename, "rb") as f:
+            self.assertEqual(f.read(), expected)
 
 
 class HandlerTest(unittest.TestCase):
@@ -160,15 +448,19 @@ class HandlerTest(unittest.TestCase):
     Tests for custom handlers and formatting
     """
 
-    TEST_FILES = {
-        "tests/yaml/hello-world.txt": YAMLHandler,
-        "tests/json/hello-json.md": JSONHandler,
-        "tests/toml/hello-toml.md": TOMLHandler,
-    }
-
-    def sanity_check(self, filename, handler_type):
+    # (filename, handler class, text), built once at import
+    FIXTURES = tuple(
+        (filename, Handler, TEXTS[filename])
+        for filename, Handler in [
+            ("tests/yaml/hello-world.txt", YAMLHandler),
+            ("tests/json/hello-json.md", JSONHandler),
+            ("tests/toml/hello-toml.md", TOMLHandler),
+        ]
+    )
+
+    def sanity_check(self, text, handler_type):
         "Ensure we can load -> dump -> load"
-        post = frontmatter.load(filename)
+        post = frontmatter.loads(text)
 
         self.assertIsInstance(post.handler, handler_type)
 
@@ -182,15 +474,52 @@ class HandlerTest(unittest.TestCase):
     def test_detect_format(self):
         "detect format based on default handlers"
 
-        for filename, Handler in self.TEST_FILES.items():
-            with codecs.open(filename, "r", "utf-8") as f:
-                format = frontmatter.detect_format(f.read(), frontmatter.handlers)
+        for filename, Handler, text in self.FIXTURES:
+            with self.subTest(filename=filename):
+                format = frontmatter.detect_format(text, frontmatter.handlers)
                 self.assertIsInstance(format, Handler)
 
+    def test_detect_format_custom_handlers(self):
+        "detect format using a list of handlers other than the defaults"
+        handlers = [JSONHandler(), YAMLHandler()]
+
+        format = frontmatter.detect_format(
+            TEXTS["tests/yaml/hello-world.txt"], handlers
+        )
+        self.assertIs(format, handlers[1])
+
+        self.assertIsNone(frontmatter.detect_format("+++\n+++\n", handlers))
+
+    def test_detect_format_changed_defaults(self):
+        "detection follows a default handler's boundary or detect method"
+        text = "~~~\ntitle: Tildes\n~~~\n\nContent"
+        handler = frontmatter.handlers[0]
+        self.assertIsInstance(handler, YAMLHandler)
+        self.assertFalse(frontmatter.checks(text))
+
+        boundary = handler.FM_BOUNDARY
+        handler.FM_BOUNDARY = re.compile(r"^~{3,}\s*$", re.MULTILINE)
+        try:
+            self.assertTrue(frontmatter.checks(text))
+            self.assertEqual(frontmatter.loads(text).metadata, {"title": "Tildes"})
+        finally:
+            handler.FM_BOUNDARY = boundary
+
+        handler.detect = lambda text: text.startswith("~~~")
+        try:
+            self.assertIs(
+                frontmatter.detect_format(text, frontmatter.handlers), handler
+            )
+        finally:
+            del handler.detect
+
+        self.assertFalse(frontmatter.checks(text))
+
     def test_sanity_all(self):
         "Run sanity check on all handlers"
-        for filename, Handler in self.TEST_FILES.items():
-            self.sanity_check(filename, Handler)
+        for filename, Handler, text in self.FIXTURES:
+            with self.subTest(filename=filename):
+                self.sanity_check(text, Handler)
 
     def test_no_handler(self):
         "default to YAMLHandler when no handler is attached"
@@ -231,101 +560,48 @@ class HandlerTest(unittest.TestCase):
 
         self.assertEqual(post["value"], "dummy frontmatter")
 
+    @unittest.skipUnless(toml, "requires toml")
     def test_toml(self):
         "load toml frontmatter"
-        if toml is None:
-            return
         post = frontmatter.load("tests/toml/hello-toml.md")
         metadata = {"author": "bob", "something": "else", "test": "tester"}
-        for k, v in metadata.items():
-            self.assertEqual(post[k], v)
+        self.assertEqual({k: post.metadata.get(k) for k in metadata}, metadata)
+
+    @unittest.skipUnless(yaml.__with_libyaml__, "requires LibYAML")
+    def test_yaml_uses_libyaml(self):
+        "use the C loader and dumper when LibYAML is available"
+        self.assertIs(default_handlers.SafeLoader, yaml.CSafeLoader)
+        self.assertIs(default_handlers.SafeDumper, yaml.CSafeDumper)
 
     def test_json(self):
         "load raw JSON frontmatter"
         post = frontmatter.load("tests/json/hello-json.md")
         metadata = {"author": "bob", "something": "else", "test": "tester"}
-        for k, v in metadata.items():
-            self.assertEqual(post[k], v)
+        self.assertEqual({k: post.metadata.get(k) for k in metadata}, metadata)
 
+    def test_json_compact(self):
+        "dump JSON frontmatter on one line and load it back"
+        post = frontmatter.load("tests/json/hello-json.md")
+        text = frontmatter.dumps(post, compact=True)
 
-class HandlerBaseTest:
-    """
-    Tests for frontmatter.handlers
-    """
-
-    def setUp(self):
-        """
-        This method should be overridden to initalize the TestCase
-        """
-        self.handler = None
-        self.data = {
-            "filename": "tests/yaml/hello-world.txt",
-            "content": """\
-""",
-            "metadata": {},
-        }
-
-    def read_from_tests(self):
-        with open(self.data["filename"]) as f:
-            return f.read()
-
-    def test_external(self):
-        filename = self.data["filename"]
-        content = self.data["content"]
-        metadata = self.data["metadata"]
-
-        post = frontmatter.load(filename)
-
-        self.assertEqual(post.content, content.strip())
-        for k, v in metadata.items():
-            self.assertEqual(post[k], v)
-
-        # dumps and then loads to ensure round trip conversions.
-        posttext = frontmatter.dumps(post, handler=self.handler)
-        post_2 = frontmatter.loads(posttext)
-
-        for k in post.metadata:
-            self.assertEqual(post.metadata[k], post_2.metadata[k])
-
-        self.assertEqual(post.content, post_2.content)
-
-    def test_detect(self):
-        text = self.read_from_tests()
-
-        self.assertTrue(self.handler.detect(text))
-
-    def test_split_content(self):
-        text = self.read_from_tests()
-
-        fm, content = self.handler.split(text)
-
-        self.assertEqual(content, self.data["content"])
-
-    def test_split_load(self):
-        text = self.read_from_tests()
-        fm, content = self.handler.split(text)
-        fm_load = self.handler.load(fm)
+        self.assertTrue(
+            text.startswith('{\n"test":"tester","author":"bob","something":"else"\n}')
+        )
+        self.assertEqual(frontmatter.loads(text).to_dict(), post.to_dict())
 
-        # The format of the failmsg makes it easy to copy into the test.
-        any_fail = False
-        failmsg = "The following metadata did not match the test:"
-        for k in self.data["metadata"]:
-            if fm_load[k] == self.data["metadata"][k]:
-                continue
-            any_fail = True
-            failmsg += '\n"{0}": {1},'.format(k, repr(fm_load[k]))
-
-        if any_fail:
-            self.fail(failmsg)
 
+class HandlerRoundtripTest(unittest.TestCase):
+    """
+    Tests for frontmatter.handlers, run against each default handler
+    """
 
-class YAMLHandlerTest(HandlerBaseTest, unittest.TestCase):
-    def setUp(self):
-        self.handler = YAMLHandler()
-        self.data = {
-            "filename": "tests/yaml/hello-markdown.md",
+    # (handler class, fixture, content after split, metadata)
+    CASES = [
+        (
+            YAMLHandler,
+            "tests/yaml/hello-markdown.md",
             # TODO: YAMLHandler.split() is prepending '\n' to the content
-            "content": """\
+            """\
 
 Title
 =====
@@ -339,17 +615,13 @@ Just need three dashes
 ---
 
 And this shouldn't break.""",
-            "metadata": {"test": "tester", "author": "bob", "something": "else"},
-        }
-
-
-class JSONHandlerTest(HandlerBaseTest, unittest.TestCase):
-    def setUp(self):
-        self.handler = JSONHandler()
-        self.data = {
-            "filename": "tests/json/hello-json.md",
+            {"test": "tester", "author": "bob", "something": "else"},
+        ),
+        (
+            JSONHandler,
+            "tests/json/hello-json.md",
             # TODO: JSONHandler.split() is prepending '\n' to the content
-            "content": """\
+            """\
 
 
 Title
@@ -365,17 +637,13 @@ Just need three dashes
 
 And this might break.
 """,
-            "metadata": {"test": "tester", "author": "bob", "something": "else"},
-        }
-
-
-class TOMLHandlerTest(HandlerBaseTest, unittest.TestCase):
-    def setUp(self):
-        self.handler = TOMLHandler()
-        self.data = {
-            "filename": "tests/toml/hello-toml.md",
+            {"test": "tester", "author": "bob", "something": "else"},
+        ),
+        (
+            TOMLHandler,
+            "tests/toml/hello-toml.md",
             # TODO: TOMLHandler.split() is prepending '\n' to the content
-            "content": """\
+            """\
 
 Title
 =====
@@ -390,8 +658,64 @@ Just need three dashes
 
 And this shouldn't break.
 """,
-            "metadata": {"test": "tester", "author": "bob", "something": "else"},
-        }
+            {"test": "tester", "author": "bob", "something": "else"},
+        ),
+    ]
+
+    def for_each_case(self, check):
+        "Run check(handler, filename, content, metadata) in a subTest per case"
+        for Handler, filename, content, metadata in self.CASES:
+            with self.subTest(filename=filename):
+                if Handler is None:
+                    self.skipTest("handler not available")
+                check(Handler(), filename, content, metadata)
+
+    def check_external(self, handler, filename, content, metadata):
+        post = frontmatter.loads(TEXTS[filename])
+
+        self.assertEqual(post.content, content.strip())
+        self.assertEqual({k: post.metadata.get(k) for k in metadata}, metadata)
+
+        # dumps and then loads to ensure round trip conversions.
+        posttext = frontmatter.dumps(post, handler=handler)
+        post_2 = frontmatter.loads(posttext)
+
+        self.assertEqual(post_2.metadata, post.metadata)
+
+        self.assertEqual(post.content, post_2.content)
+
+    def check_detect(self, handler, filename, content, metadata):
+        self.assertTrue(handler.detect(TEXTS[filename]))
+
+    def check_split_content(self, handler, filename, content, metadata):
+        fm, split_content = handler.split(TEXTS[filename])
+
+        self.assertEqual(split_content, content)
+
+    def check_split_load(self, handler, filename, content, metadata):
+        fm, _ = handler.split(TEXTS[filename])
+        fm_load = handler.load(fm)
+
+        mismatched = {k: fm_load[k] for k in metadata if fm_load[k] != metadata[k]}
+
+        # The format of the failmsg makes it easy to copy into the test.
+        if mismatched:
+            failmsg = "The following metadata did not match the test:"
+            for k, v in mismatched.items():
+                failmsg += '\n"{0}": {1},'.format(k, repr(v))
+            self.fail(failmsg)
+
+    def test_external(self):
+        self.for_each_case(self.check_external)
+
+    def test_detect(self):
+        self.for_each_case(self.check_detect)
+
+    def test_split_content(self):
+        self.for_each_case(self.check_split_content)
+
+    def test_split_load(self):
+        self.for_each_case(self.check_split_load)
 
 
 if __name__ == "__main__":